@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+from glove_store import GloveStore
+from summarizer import Summarizer, save_summaries
+
+# Per-process state set up once by init_worker
+worker = {}
+
+
+def share_glove_vectors(glove_vectors, glove_file):
+    # A memory-mapped store is shared through the page cache, so workers just map the same file
+    if isinstance(glove_vectors.vectors, np.memmap):
+        return None, ('file', glove_file)
+
+    # Otherwise copy the parsed matrix into one shared memory block that every worker attaches to
+    vectors = np.ascontiguousarray(glove_vectors.vectors)
+    shm = shared_memory.SharedMemory(create=True, size=max(vectors.nbytes, 1))
+    np.ndarray(vectors.shape, dtype=vectors.dtype, buffer=shm.buf)[:] = vectors
+    return shm, ('shared', shm.name, vectors.shape, vectors.dtype.str, glove_vectors.vocab)
+
+
+def init_worker(glove_source, options):
+    # One BLAS thread per worker, the pool already uses every core
+    threadpool_limits(1)
+
+    if glove_source[0] == 'file':
+        summarizer = Summarizer(glove_source[1], **options)
+        summarizer.ensure_glove_vectors()
+    else:
+        _, name, shape, dtype, vocab = glove_source
+        shm = shared_memory.SharedMemory(name=name)
+        worker['shm'] = shm  # Keep the block attached for the lifetime of the worker
+        vectors = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        summarizer = Summarizer(glove_vectors=GloveStore(vocab, vectors), **options)
+    worker['summarizer'] = summarizer
+
+
+def summarize_file(file_path, summary_folder, write_artifacts, family=None):
+    """Summarize one file in a worker and write its Summary/ALL * outputs."""
+    input_filename = os.path.splitext(os.path.basename(file_path))[0]
+    start = time.perf_counter()
+    try:
+        # The file is streamed in chunks, so large policy bundles never sit in memory as one string
+        artifacts_folder = os.path.join(summary_folder, input_filename) if write_artifacts else None
+        result = worker['summarizer'].summarize(file_path=file_path, artifacts_folder=artifacts_folder, family=family)
+        save_summaries(result, input_filename, summary_folder)
+
+        return {
+            'file': file_path,
+            'name': input_filename,
+            'sentences': len(result['preprocess']),
+            'summary': result['summary'],
+            'seconds': time.perf_counter() - start,
+            'error': None
+        }
+    except Exception as e:
+        return {
+            'file': file_path,
+            'name': input_filename,
+            'sentences': 0,
+            'summary': [],
+            'seconds': time.perf_counter() - start,
+            'error': str(e)
+        }
+
+
+def summarize_files(file_paths, summary_folder, write_artifacts, family=None):
+    """Summarize files one after another in a worker; revisions of a family warm-start from the previous one."""
+    try:
+        return [summarize_file(file_path, summary_folder, write_artifacts, family) for file_path in file_paths]
+    finally:
+        # The factors are only needed within this run, and a worker may serve many families
+        if family is not None:
+            worker['summarizer'].nmf_families.pop(family, None)
+
+
+def batch_jobs(file_paths, families):
+    # One job per document, except that all revisions of a family form a single job in input order,
+    # so they run on the same worker and each one can warm-start from the NMF fit of the one before
+    jobs = {}
+    for i, file_path in enumerate(file_paths):
+        family = families.get(file_path)
+        jobs.setdefault(('document', i) if family is None else ('family', family), []).append(i)
+    return [(None if kind == 'document' else key, indices) for (kind, key), indices in jobs.items()]
+
+
+def batch_summarize(file_paths, summarizer, workers=None, summary_folder="Summary", write_artifacts=False, progress_callback=None,
+                    families=None):
+    """Summarize many files over a process pool; results come back in input order.
+
+    families optionally maps a file path to a family name; files of one family are revisions of the same
+    policy and are summarized in input order on one worker, warm-starting each NMF fit from the last.
+    progress_callback(done, total, result) runs as each document finishes (a family's documents are
+    reported together when the family is done); raising from it cancels the jobs that have not started yet.
+    """
+    file_paths = list(file_paths)
+    if not file_paths:
+        return []
+    jobs = batch_jobs(file_paths, families or {})
+
+    glove_vectors = summarizer.ensure_glove_vectors()
+    shm, glove_source = share_glove_vectors(glove_vectors, summarizer.glove_file)
+    options = {'keywords': summarizer.keywords, 'nmf_config': summarizer.nmf_config, 'refit_drift': summarizer.refit_drift,
+               'combinations': summarizer.combinations, 'summary_ratio': summarizer.summary_ratio,
+               'summary_length': summarizer.summary_length, 'cache': summarizer.cache,
+               'stage_workers': 1}  # Documents already run in parallel, so each one runs its stages serially
+
+    # Workers get the vectors by name and so count as external; without the version they would each hash
+    # the whole GloVe matrix for their first stage fingerprint, with or without a cache
+    options['embedding_version'] = summarizer.glove_version()
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    results = [None] * len(file_paths)
+    try:
+        # Spawned, not forked: the UI starts batches from a QThread, and forking a threaded process can leave
+        # children stuck on locks held by other threads. The GloVe matrix is handed over by name, not inherited
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=init_worker, initargs=(glove_source, options)) as executor:
+            futures = {executor.submit(summarize_files, [file_paths[i] for i in indices], summary_folder, write_artifacts,
+                                       family): indices
+                       for family, indices in jobs}
+            try:
+                done = 0
+                for future in as_completed(futures):
+                    for i, result in zip(futures[future], future.result()):
+                        results[i] = result
+                        done += 1
+                        if progress_callback is not None:
+                            progress_callback(done, len(file_paths), result)
+            except BaseException:
+                # Drop the documents that have not started yet, e.g. when the callback cancels the batch
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    return results
@@ -0,0 +1,149 @@
+import os
+import sys
+
+import numpy as np
+
+
+class GloveStore:
+    """GloVe vectors kept as one matrix plus a word index, with the same lookups as a dict of vectors."""
+
+    def __init__(self, vocab, vectors):
+        self.vocab = list(vocab)
+        self.vectors = vectors
+        self.index = {word: i for i, word in enumerate(self.vocab)}
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def __contains__(self, word):
+        return word in self.index
+
+    def __getitem__(self, word):
+        return self.vectors[self.index[word]]
+
+    def __iter__(self):
+        return iter(self.vocab)
+
+    def get(self, word, default=None):
+        i = self.index.get(word)
+        return default if i is None else self.vectors[i]
+
+    def keys(self):
+        return self.vocab
+
+    def values(self):
+        return (self.vectors[i] for i in range(len(self.vocab)))
+
+    def items(self):
+        return zip(self.vocab, self.values())
+
+
+def store_paths(glove_file):
+    # vectors.txt -> vectors.npy (float32 matrix) and vectors.vocab (one word per line)
+    prefix = os.path.splitext(glove_file)[0]
+    return prefix + '.npy', prefix + '.vocab'
+
+
+def read_glove_text(glove_file, dtype=float):
+    # Later duplicates overwrite earlier rows, like the original dict-based loader
+    index = {}
+    rows = []
+    with open(glove_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            values = line.split()
+            if not values:
+                continue
+            word = values[0]
+            vector = np.array(values[1:], dtype=dtype)
+            if word in index:
+                rows[index[word]] = vector
+            else:
+                index[word] = len(rows)
+                rows.append(vector)
+    return list(index), np.array(rows, dtype=dtype)
+
+
+def convert_glove_vectors(glove_file):
+    """One-time conversion of a GloVe text file into a float32 .npy matrix and a .vocab index."""
+    matrix_path, vocab_path = store_paths(glove_file)
+    vocab, vectors = read_glove_text(glove_file, dtype=np.float32)
+
+    np.save(matrix_path, vectors)
+    with open(vocab_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(vocab))
+        f.write('\n')
+    return matrix_path, vocab_path
+
+
+def has_glove_store(glove_file):
+    # The binary store is used only if it exists and is not older than the text file
+    matrix_path, vocab_path = store_paths(glove_file)
+    if not (os.path.exists(matrix_path) and os.path.exists(vocab_path)):
+        return False
+    if os.path.exists(glove_file):
+        return os.path.getmtime(matrix_path) >= os.path.getmtime(glove_file)
+    return True
+
+
+def glove_file_version(glove_file):
+    """Identify the vectors load_glove_vectors would load for glove_file, from file stats and dtype only."""
+    if has_glove_store(glove_file):
+        # The converted store is what gets loaded, so it is the store's files and dtype that count
+        matrix_path, vocab_path = store_paths(glove_file)
+        dtype = np.load(matrix_path, mmap_mode='r').dtype  # Reads the .npy header only
+        files = [matrix_path, vocab_path]
+    else:
+        dtype = np.dtype(float)
+        files = [glove_file]
+    stats = [f"{os.path.abspath(path)}:{os.stat(path).st_size}:{os.stat(path).st_mtime_ns}" for path in files]
+    return ';'.join(stats + [dtype.str])
+
+
+def load_glove_store(glove_file):
+    """Memory-map the converted store so worker processes share it through the page cache."""
+    matrix_path, vocab_path = store_paths(glove_file)
+    vectors = np.load(matrix_path, mmap_mode='r')
+    with open(vocab_path, 'r', encoding='utf-8') as f:
+        vocab = f.read().split('\n')[:-1]
+    if len(vocab) != vectors.shape[0]:
+        raise ValueError(f"GloVe store {vocab_path} has {len(vocab)} words but {matrix_path} has {vectors.shape[0]} rows.")
+    return GloveStore(vocab, vectors)
+
+
+def build_sentence_embeddings(sentences, store):
+    """Average the GloVe vectors of every sentence with one sparse sentence-by-token matrix multiply."""
+    from scipy import sparse  # Imported on first use, scipy is slow to import
+
+    # Map each token to a vocabulary id once; only the document's own words are pulled from the store
+    local_index = {}
+    rows = []
+    cols = []
+    for row, sentence in enumerate(sentences):
+        for word in sentence.split():
+            i = store.index.get(word)
+            if i is not None:
+                rows.append(row)
+                cols.append(local_index.setdefault(i, len(local_index)))
+
+    # Repeated (row, col) entries are summed, so each cell holds the token count
+    counts = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(sentences), len(local_index)))
+    local_vectors = np.asarray(store.vectors[list(local_index)], dtype=float).reshape(len(local_index), store.dim)
+
+    sums = counts @ local_vectors
+    valid_counts = np.asarray(counts.sum(axis=1)).ravel()
+
+    # Sentences without any known word keep a zero vector
+    embeddings = np.zeros_like(sums)
+    np.divide(sums, valid_counts[:, None], out=embeddings, where=valid_counts[:, None] > 0)
+    return embeddings, valid_counts
+
+
+if __name__ == "__main__":
+    # Usage: python glove_store.py vectors.txt [more.txt ...]
+    for path in sys.argv[1:]:
+        matrix_path, vocab_path = convert_glove_vectors(path)
+        print(f"Converted {path} to {matrix_path} and {vocab_path}")
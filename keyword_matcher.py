@@ -0,0 +1,46 @@
+import numpy as np
+
+
+class KeywordMatcher:
+    """Token trie over the rhetorical keyword phrases, built once and matched on whole words only."""
+
+    def __init__(self, keywords):
+        self.keywords = {category: list(phrases) for category, phrases in keywords.items()}
+        self.categories = list(keywords)
+        # Each node maps the next token to its child; the None key holds the categories of a phrase ending there
+        self.trie = {}
+        for category, phrases in enumerate(keywords.values()):
+            for phrase in phrases:
+                node = self.trie
+                for token in phrase.lower().split():
+                    node = node.setdefault(token, {})
+                node.setdefault(None, []).append(category)
+
+    def match(self, sentences):
+        """Count keyword matches of every sentence in one pass over its tokens.
+
+        Returns (counts, matches): counts[i, c] is the number of phrases of category c found in
+        sentence i, and matches[i] the number of keyword phrases found in it, whatever their category.
+        """
+        counts = np.zeros((len(sentences), len(self.categories)), dtype=int)
+        matches = np.zeros(len(sentences), dtype=int)
+        trie = self.trie
+
+        for row, sentence in enumerate(sentences):
+            words = sentence.lower().split()
+            for start, word in enumerate(words):
+                node = trie.get(word)
+                end = start + 1
+                # Follow the phrase as long as the next words continue it; every phrase ending on the way counts
+                while node is not None:
+                    categories = node.get(None)
+                    if categories is not None:
+                        matches[row] += 1
+                        for category in categories:
+                            counts[row, category] += 1
+                    if end == len(words):
+                        break
+                    node = node.get(words[end])
+                    end += 1
+
+        return counts, matches
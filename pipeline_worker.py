@@ -0,0 +1,149 @@
+import threading
+from collections import deque
+
+from PyQt5.QtCore import QMetaObject, QObject, QThread, Qt, pyqtSignal, pyqtSlot
+
+from summarizer import SummarizationCancelled
+
+
+class PipelineJob:
+    """One unit of work: fn(job) runs on the pipeline thread, the callbacks run back on the GUI thread."""
+
+    def __init__(self, name, fn, on_done=None, on_error=None, on_progress=None, on_partial=None, on_cancelled=None):
+        self.name = name
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_partial = on_partial
+        self.on_cancelled = on_cancelled
+        self.worker = None
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        # Called between stages; unwinds the running job back to the worker loop
+        if self.cancel_event.is_set():
+            raise SummarizationCancelled(f"{self.name} was cancelled.")
+
+    def report_progress(self, value, label=""):
+        self.check_cancelled()
+        self.worker.progress.emit(self, int(value), label)
+
+    def report_partial(self, key, value):
+        self.check_cancelled()
+        self.worker.partial.emit(self, key, value)
+
+
+class PipelineWorker(QObject):
+    """Lives on the pipeline thread and runs the queued jobs one at a time."""
+
+    progress = pyqtSignal(object, int, str)
+    partial = pyqtSignal(object, str, object)
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, str)
+    cancelled = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        # Appended on the GUI thread and popped on the pipeline thread; deque operations are atomic
+        self.jobs = deque()
+
+    @pyqtSlot()
+    def run_next(self):
+        try:
+            job = self.jobs.popleft()
+        except IndexError:
+            return
+
+        # Jobs cancelled while still queued are dropped without running
+        if job.is_cancelled():
+            self.cancelled.emit(job)
+            return
+
+        try:
+            value = job.fn(job)
+        except SummarizationCancelled:
+            self.cancelled.emit(job)
+        except Exception as e:
+            self.failed.emit(job, str(e))
+        else:
+            self.finished.emit(job, value)
+
+
+class PipelineRunner(QObject):
+    """Owns the pipeline thread; jobs run in submission order and report back through Qt signals."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Jobs submitted but not yet reported back, only touched on the GUI thread
+        self.pending = []
+
+        self.thread = QThread()
+        self.worker = PipelineWorker()
+        self.worker.moveToThread(self.thread)
+
+        # Queued connections, so every callback runs on the GUI thread
+        self.worker.progress.connect(self.on_progress)
+        self.worker.partial.connect(self.on_partial)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.cancelled.connect(self.on_cancelled)
+        self.thread.start()
+
+    def submit(self, job):
+        job.worker = self.worker
+        self.pending.append(job)
+        self.worker.jobs.append(job)
+        QMetaObject.invokeMethod(self.worker, 'run_next', Qt.QueuedConnection)
+        return job
+
+    def is_busy(self):
+        return bool(self.pending)
+
+    def cancel_all(self):
+        for job in self.pending:
+            job.cancel()
+
+    def stop(self):
+        # Let the running job reach its next stage boundary, then shut the thread down
+        self.cancel_all()
+        self.thread.quit()
+        self.thread.wait()
+
+    def done(self, job):
+        if job in self.pending:
+            self.pending.remove(job)
+
+    @pyqtSlot(object, int, str)
+    def on_progress(self, job, value, label):
+        if job.on_progress is not None and not job.is_cancelled():
+            job.on_progress(value, label)
+
+    @pyqtSlot(object, str, object)
+    def on_partial(self, job, key, value):
+        if job.on_partial is not None:
+            job.on_partial(key, value)
+
+    @pyqtSlot(object, object)
+    def on_finished(self, job, value):
+        self.done(job)
+        if job.on_done is not None:
+            job.on_done(value)
+
+    @pyqtSlot(object, str)
+    def on_failed(self, job, message):
+        self.done(job)
+        if job.on_error is not None:
+            job.on_error(message)
+
+    @pyqtSlot(object)
+    def on_cancelled(self, job):
+        self.done(job)
+        if job.on_cancelled is not None:
+            job.on_cancelled()
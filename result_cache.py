@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import pickle
+import platform
+from importlib import metadata
+
+import numpy as np
+
+# Bump to invalidate every cached result when the stored layout changes
+CACHE_VERSION = 1
+
+# Source files whose contents decide the results; editing any of them makes older entries stale
+PIPELINE_MODULES = ['summarizer.py', 'stage_graph.py', 'segmenter.py', 'keyword_matcher.py', 'score_fusion.py', 'glove_store.py']
+
+# Libraries whose versions decide the results and the pickled classes; read from the installed
+# package metadata, so sklearn and scipy are not imported just to build a key
+PIPELINE_LIBRARIES = ['numpy', 'pandas', 'scipy', 'scikit-learn']
+
+# Bytes hashed per read for files and GloVe matrices
+HASH_CHUNK_SIZE = 1 << 20
+
+code_hash = None
+library_versions = None
+
+
+def code_version():
+    """Hash of the pipeline source files, computed once per process."""
+    global code_hash
+    if code_hash is None:
+        digest = hashlib.sha256()
+        folder = os.path.dirname(os.path.abspath(__file__))
+        for module in PIPELINE_MODULES:
+            with open(os.path.join(folder, module), 'rb') as f:
+                digest.update(f.read())
+        code_hash = digest.hexdigest()
+    return code_hash
+
+
+def library_version():
+    """{library: installed version} of the pipeline libraries and of Python, read once per process."""
+    global library_versions
+    if library_versions is None:
+        versions = {'python': platform.python_version()}
+        for library in PIPELINE_LIBRARIES:
+            try:
+                versions[library] = metadata.version(library)
+            except metadata.PackageNotFoundError:
+                versions[library] = None
+        library_versions = versions
+    return library_versions
+
+
+def hash_text(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def hash_file(file_path):
+    # Streamed, so large policy bundles are hashed without being read whole
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_glove_vectors(glove_vectors):
+    """Hash a GloveStore's vocabulary and matrix, a block of rows at a time."""
+    digest = hashlib.sha256()
+    digest.update('\n'.join(glove_vectors.vocab).encode('utf-8'))
+    vectors = glove_vectors.vectors
+    digest.update(str((vectors.shape, vectors.dtype.str)).encode('utf-8'))
+    rows = max(1, HASH_CHUNK_SIZE // max(vectors[:1].nbytes, 1))
+    for start in range(0, len(vectors), rows):
+        digest.update(np.ascontiguousarray(vectors[start:start + rows]).data)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Content-addressed store of finished results, one pickle per key under folder/<key[:2]>/."""
+
+    def __init__(self, folder='.summary_cache'):
+        self.folder = folder
+
+    def key(self, document_hash, config, embedding_version):
+        # Any change to the text, the settings, the embeddings, the pipeline code or its libraries gives a new key
+        fingerprint = json.dumps({
+            'version': CACHE_VERSION,
+            'code': code_version(),
+            'libraries': library_version(),
+            'document': document_hash,
+            'config': config,
+            'embeddings': embedding_version
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.folder, key[:2], f"{key}.pkl")
+
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # A truncated or unreadable entry, or one pickled against other library versions that no longer
+            # loads (ModuleNotFoundError, AttributeError, ...), is a miss and gets rewritten
+            return None
+
+    def put(self, key, result):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first, so concurrent readers never see a partial entry
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        return path
@@ -0,0 +1,269 @@
+import csv
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROUGE_HEADER = ['Filename', 'ROUGE-1', 'ROUGE-2', 'ROUGE-L']
+AVERAGE_HEADER = ['Key', 'Average ROUGE-1', 'Average ROUGE-2', 'Average ROUGE-L']
+
+# System summary folders written by save_summaries, e.g. "Summary/ALL 2 NMF GLOVE"
+SYSTEM_PREFIX = 'ALL '
+
+# Evaluation keys of the systems, one per upload button; a folder's key is the one with its number or letter
+SYSTEM_KEYS = ["1 NMF", "2 NMFG", "3 NMFGR", "4 NMFGS", "5 NMFGC", "6 NMFGRSC", "7 NMFGRC", "8 NMFGRS", "9 NMFRSC", "A NMFGRSC"]
+
+# Below this many file pairs, starting a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+# Per-process state set up once by init_worker
+worker = {}
+
+
+class CachedStemmer:
+    """Porter stemmer that remembers every word it stemmed; policies reuse a small vocabulary."""
+
+    def __init__(self):
+        from nltk.stem import porter  # Imported on first use, nltk is slow to import
+
+        self.stemmer = porter.PorterStemmer()
+        self.stems = {}
+
+    def stem(self, word):
+        stem = self.stems.get(word)
+        if stem is None:
+            stem = self.stems[word] = self.stemmer.stem(word)
+        return stem
+
+
+def file_stem(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def stem_index(files, index=None):
+    """Add files to a {file name without extension: path} index; the first file with a name wins."""
+    index = {} if index is None else index
+    for file_path in files:
+        index.setdefault(file_stem(file_path), file_path)
+    return index
+
+
+def match_report(reference_index, system_index):
+    """(references without a generated file, generated files without a reference) of one system, by name."""
+    unmatched = [name for name in reference_index if name not in system_index]
+    orphans = [name for name in system_index if name not in reference_index]
+    return unmatched, orphans
+
+
+def scan_text_files(folder):
+    """stem_index() of the .txt files directly inside folder, in name order, from one os.scandir pass."""
+    with os.scandir(folder) as entries:
+        paths = sorted(entry.path for entry in entries if entry.is_file() and entry.name.endswith('.txt'))
+    return stem_index(paths)
+
+
+def system_key(folder_name):
+    # "ALL 2 NMF GLOVE" is scored as "2 NMFG"; folders of unknown systems keep their own name
+    label = folder_name[len(SYSTEM_PREFIX):]
+    for key in SYSTEM_KEYS:
+        if key.split()[0] == label.split()[0]:
+            return key
+    return label
+
+
+def discover_systems(summary_folder, exclude=()):
+    """{system key: stem_index()} of every "ALL *" folder in summary_folder, in folder name order."""
+    with os.scandir(summary_folder) as entries:
+        folders = sorted((entry.name, entry.path) for entry in entries
+                         if entry.is_dir() and entry.name.startswith(SYSTEM_PREFIX) and os.path.abspath(entry.path) not in exclude)
+    return {system_key(name): scan_text_files(path) for name, path in folders}
+
+
+def read_text(file_path):
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except Exception as e:
+        # An unreadable file scores 0 instead of stopping the whole evaluation
+        print(f"Error reading file {file_path}: {e}")
+        return None
+
+
+def prepare_text(text, stemmer):
+    """Tokens and unigram/bigram counts of a text, tokenized like RougeScorer(use_stemmer=True)."""
+    from rouge_score import tokenize
+
+    if text is None:
+        return None
+    tokens = tokenize.tokenize(text, stemmer)
+    return {
+        'tokens': tokens,
+        'unigrams': Counter(tokens),
+        'bigrams': Counter(zip(tokens, tokens[1:]))
+    }
+
+
+def prepare_reference(text, stemmer):
+    reference = prepare_text(text, stemmer)
+    if reference is not None:
+        # Bit i of masks[token] is set where the reference has that token, for the bit-parallel LCS
+        masks = {}
+        for i, token in enumerate(reference['tokens']):
+            masks[token] = masks.get(token, 0) | (1 << i)
+        reference['masks'] = masks
+    return reference
+
+
+def fmeasure(precision, recall):
+    return 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+
+
+def ngram_fmeasure(reference_ngrams, generated_ngrams):
+    # Clipped overlap, as in rouge_score: each reference n-gram counts at most as often as it was generated
+    overlap = sum(min(count, generated_ngrams[ngram]) for ngram, count in reference_ngrams.items())
+    precision = overlap / max(sum(generated_ngrams.values()), 1)
+    recall = overlap / max(sum(reference_ngrams.values()), 1)
+    return fmeasure(precision, recall)
+
+
+def lcs_length(reference, generated_tokens):
+    """LCS length of the reference and generated tokens, one big-int update per generated token.
+
+    Same result as the O(n*m) table rouge_score builds, with the reference rows packed into the bits of V.
+    """
+    full = (1 << len(reference['tokens'])) - 1
+    masks = reference['masks']
+    v = full
+    for token in generated_tokens:
+        u = v & masks.get(token, 0)
+        v = ((v + u) | (v - u)) & full
+    return len(reference['tokens']) - bin(v).count('1')
+
+
+def score_texts(reference, generated):
+    """(ROUGE-1, ROUGE-2, ROUGE-L) F-measures of a generated text against a prepared reference."""
+    if reference is None or generated is None:
+        return 0, 0, 0
+
+    r1 = ngram_fmeasure(reference['unigrams'], generated['unigrams'])
+    r2 = ngram_fmeasure(reference['bigrams'], generated['bigrams'])
+    rl = 0
+    if reference['tokens'] and generated['tokens']:
+        lcs = lcs_length(reference, generated['tokens'])
+        rl = fmeasure(lcs / len(generated['tokens']), lcs / len(reference['tokens']))
+    return r1, r2, rl
+
+
+def init_worker(references):
+    worker['references'] = references
+    worker['stemmer'] = CachedStemmer()
+
+
+def score_file(pair):
+    """Score one (reference name, generated file) pair in a worker against its copy of the references."""
+    name, gen_file = pair
+    generated = prepare_text(read_text(gen_file), worker['stemmer'])
+    return score_texts(worker['references'][name], generated)
+
+
+class RougeEvaluator:
+    """Scores system summaries against reference summaries that are read, tokenized and stemmed only once.
+
+    References and generated files come as stem_index() dicts, so pairing them is a lookup by file name;
+    scoring runs over a process pool that receives the prepared references once per worker.
+    """
+
+    def __init__(self, reference_index, workers=None):
+        self.stemmer = CachedStemmer()
+        self.reference_index = dict(reference_index)
+        self.references = {name: prepare_reference(read_text(ref_file), self.stemmer)
+                           for name, ref_file in self.reference_index.items()}
+        self.workers = workers
+
+    def pairs(self, system_index):
+        """(reference name, generated file) pairs in reference order."""
+        return [(name, system_index[name]) for name in self.reference_index if name in system_index]
+
+    def score_pairs(self, pairs, progress_callback=None):
+        # Small jobs are scored in this process, larger ones over the pool in ordered chunks
+        workers = min(self.workers or os.cpu_count() or 1, max(len(pairs) // PARALLEL_THRESHOLD, 1))
+        if workers == 1:
+            init_worker(self.references)
+            scores = map(score_file, pairs)
+            executor = None
+        else:
+            # Spawned rather than forked, since the UI runs evaluations from a QThread of a threaded process
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=init_worker, initargs=(self.references,))
+            scores = executor.map(score_file, pairs, chunksize=max(1, len(pairs) // (workers * 8)))
+
+        try:
+            results = []
+            for score in scores:
+                results.append(score)
+                if progress_callback is not None:
+                    progress_callback(len(results), len(pairs))
+            return results
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def evaluate(self, systems, rouge_score_folder, progress_callback=None):
+        """Score every system's files and write <key>_rouge_scores.csv plus average_rouge_scores.csv.
+
+        systems maps a system key to the stem_index() of its generated files; keys without files are skipped.
+        Returns the [key, average ROUGE-1, average ROUGE-2, average ROUGE-L] rows.
+        """
+        os.makedirs(rouge_score_folder, exist_ok=True)
+        jobs = [(key, self.pairs(index)) for key, index in systems.items() if index]
+
+        # Every system is scored in one pass over the pool, then split back per key
+        all_pairs = [pair for _, pairs in jobs for pair in pairs]
+        all_scores = self.score_pairs(all_pairs, progress_callback)
+
+        avg_scores = []
+        start = 0
+        for key, pairs in jobs:
+            scores = all_scores[start:start + len(pairs)]
+            start += len(pairs)
+
+            csv_path = os.path.join(rouge_score_folder, f"{key}_rouge_scores.csv")
+            with open(csv_path, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(ROUGE_HEADER)
+                for (name, _), (r1, r2, rl) in zip(pairs, scores):
+                    writer.writerow([name, r1, r2, rl])
+
+            if scores:
+                mean_r1, mean_r2, mean_rl = (np.mean(column) for column in zip(*scores))
+                avg_scores.append([key, mean_r1, mean_r2, mean_rl])
+
+        avg_csv_path = os.path.join(rouge_score_folder, "average_rouge_scores.csv")
+        with open(avg_csv_path, 'w', newline='') as avg_csvfile:
+            avg_writer = csv.writer(avg_csvfile)
+            avg_writer.writerow(AVERAGE_HEADER)
+            avg_writer.writerows(avg_scores)
+
+        return avg_scores
+
+
+def evaluate_folders(reference_folder, summary_folder="Summary", workers=None, progress_callback=None):
+    """Score every "ALL *" system folder of summary_folder against the references in reference_folder.
+
+    Writes the same ALL_ROUGE_SCORE CSVs as the upload-based evaluation and returns
+    (average rows, {system key: match_report()}).
+    """
+    reference_index = scan_text_files(reference_folder)
+    if not reference_index:
+        raise ValueError(f"No reference .txt files found in {reference_folder}.")
+
+    systems = discover_systems(summary_folder, exclude={os.path.abspath(reference_folder)})
+    if not any(systems.values()):
+        raise ValueError(f"No summaries found in the '{SYSTEM_PREFIX}*' folders of {summary_folder}.")
+
+    reports = {key: match_report(reference_index, index) for key, index in systems.items() if index}
+    evaluator = RougeEvaluator(reference_index, workers)
+    avg_scores = evaluator.evaluate(systems, os.path.join(summary_folder, "ALL_ROUGE_SCORE"), progress_callback)
+    return avg_scores, reports
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def combination_weights(spec):
+    # A combination is either a list of score columns, each weighted 1, or a {column: weight} dict
+    if isinstance(spec, dict):
+        return {column: float(weight) for column, weight in spec.items()}
+    return {column: 1.0 for column in spec}
+
+
+def dense_ranks(totals):
+    """Rank every column at once, like Series.rank(ascending=False, method='dense') on each of them."""
+    order = np.argsort(-totals, axis=0, kind='stable')
+    ordered = np.take_along_axis(totals, order, axis=0)
+
+    # A new rank starts wherever the sorted value changes; the first row always starts rank 1
+    steps = np.diff(ordered, axis=0, prepend=np.nan) != 0
+    ranks = np.empty(totals.shape, dtype=int)
+    np.put_along_axis(ranks, order, np.cumsum(steps, axis=0), axis=0)
+    return ranks
+
+
+class ScoreFusion:
+    """Score every configured combination as a weighted sum of its columns, all rows at once."""
+
+    def __init__(self, combinations):
+        self.combinations = {name: combination_weights(spec) for name, spec in combinations.items()}
+        self.names = list(self.combinations)
+
+        # Every score column used by any combination, in first-use order
+        self.columns = list(dict.fromkeys(column for weights in self.combinations.values() for column in weights))
+
+    def fuse(self, scores_df):
+        """Return (totals, ranks), one column per combination in self.names, for the rows of scores_df."""
+        values = scores_df[self.columns].to_numpy(dtype=float)
+
+        # Summed column by column in the combination's own order rather than with a BLAS matmul, whose
+        # accumulation order varies by library and could flip the ties dense_ranks breaks
+        totals = np.zeros((len(values), len(self.names)))
+        for k, weights in enumerate(self.combinations.values()):
+            for column, weight in weights.items():
+                totals[:, k] += values[:, self.columns.index(column)] * weight
+        return totals, dense_ranks(totals)
+
+
+def top_k_indices(scores, k):
+    """Indices of the k highest scores in document order, found in O(n) with a partition.
+
+    Ties at the cut-off go to the earliest sentences, so exactly k indices come back and the
+    selection does not depend on the partition's internal order.
+    """
+    scores = np.asarray(scores, dtype=float)
+    k = max(0, min(int(k), len(scores)))
+    if k == 0:
+        return np.empty(0, dtype=int)
+
+    # The k-th highest score is the cut-off; everything above it is in, ties fill the remaining places
+    threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+    selected = scores > threshold
+    ties = np.flatnonzero(scores == threshold)
+    selected[ties[:k - np.count_nonzero(selected)]] = True
+    return np.flatnonzero(selected)
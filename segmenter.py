@@ -0,0 +1,138 @@
+import codecs
+import os
+import re
+
+# Common abbreviations that shouldn't be split
+ABBREVIATIONS = [
+    'mr', 'mrs', 'dr', 'ms', 'inc', 'ltd', 'prof', 'sr', 'jr',
+    'st', 'mt', 'vs', 'amp', 'faq', 'etc', 'e.g', 'i.e'
+]
+
+# stop words
+STOP_WORDS = {
+    'the', 'is',  'of',  'a', 'on', 'for',
+    'with',  'it',  'by', 'this', 'from',  'an', 'be', 'was', 'were', 'are'
+}
+
+# Bytes read per chunk when streaming a file
+CHUNK_SIZE = 1 << 20
+
+# Patterns compiled once at import instead of on every line
+NUMBER_SENTENCE_PATTERN = re.compile(r'(?<!\d)(\d+\.\d*)\s+(?=[A-Za-z])')  # Numbered sentences, e.g. "1.1 sentence"
+NUMBER_DOT_PATTERN = re.compile(r'(?<=\d)\s*\.\s*')
+NUMBER_PATTERN = re.compile(r'\d\s*\.')  # Both numbering patterns need a digit followed by a period
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?]) +')
+ABBREVIATION_PATTERN = re.compile(r'\b(?:' + '|'.join(ABBREVIATIONS) + r')\.$')  # Abbreviations ending with a period
+
+
+def deletion_bytes(keep):
+    # Sentences are pure ASCII once the non-ASCII characters are gone, so bytes.translate can delete
+    # the same characters as a negated regex class without going through the regex engine
+    return bytes(code for code in range(128) if not keep(chr(code)))
+
+
+# Same characters as re.sub(r'[^a-zA-Z\s,.0-9()]', '', ...): numbers, periods (in decimals), and parentheses
+PROCESSED_DELETE = deletion_bytes(lambda c: c.isalpha() or c.isspace() or c in ',.0123456789()')
+
+# Same characters as re.sub(r'[^a-zA-Z\s]', '', ...): no numbers, special chars or punctuation
+CLEANED_DELETE = deletion_bytes(lambda c: c.isalpha() or c.isspace())
+
+
+def ascii_lines(content):
+    """Lowercase the text once, split it into lines once and drop every non-ASCII character."""
+    lines = content.lower().splitlines()
+    if not lines:
+        return []
+    # The lines no longer contain '\n', so joining, filtering and splitting keeps the same line boundaries
+    return '\n'.join(lines).encode('ascii', 'ignore').decode('ascii').split('\n')
+
+
+def segment_line(line):
+    """Split one lowercased ASCII line into sentences after normalizing its numbering."""
+    # Most lines have no numbering and skip both substitutions
+    if NUMBER_PATTERN.search(line):
+        # Ensure that numbered sentences (e.g., 1.1 sentence) are properly split into new lines
+        line = NUMBER_SENTENCE_PATTERN.sub(r'\1 ', line)
+
+        # Remove whitespace around periods that follow a digit
+        line = NUMBER_DOT_PATTERN.sub('.', line)
+
+    # Split by sentence-ending punctuation
+    return SENTENCE_END_PATTERN.split(line)
+
+
+def clean_sentence(sentence):
+    """Return the (cleaned, processed) variants of an original sentence."""
+    encoded = sentence.encode('ascii')
+    processed = encoded.translate(None, PROCESSED_DELETE).decode('ascii').strip()
+    cleaned = encoded.translate(None, CLEANED_DELETE).decode('ascii')
+    cleaned = ' '.join([word for word in cleaned.split() if word not in STOP_WORDS and len(word) > 1])
+    return cleaned, processed
+
+
+def line_sentences(line):
+    """Yield (cleaned, processed, original) for every sentence of one lowercased ASCII line."""
+    for sentence in segment_line(line):
+        sentence = sentence.strip()  # Clean whitespace from ends
+
+        # Skip short sentences or known abbreviations
+        if len(sentence.split()) < 3 or (sentence.endswith('.') and ABBREVIATION_PATTERN.search(sentence)):
+            continue
+
+        # Add a quote to sentences starting with '=' or '+' to avoid Excel issues
+        if sentence.startswith(('=', '+', '-')):
+            sentence = "'" + sentence
+
+        cleaned, processed = clean_sentence(sentence)
+        yield cleaned, processed, sentence
+
+
+def iter_sentences(content, progress_callback=None):
+    """Yield (cleaned, processed, original) for every sentence in one pass over the text.
+
+    progress_callback(done, total) is called with line counts whenever the whole percentage changes.
+    """
+    lines = ascii_lines(content)
+    total_lines = len(lines)
+    last_percent = -1
+
+    for i, line in enumerate(lines):
+        # Report progress only when the whole percentage changes, so callers are not flooded
+        percent = (i + 1) * 100 // total_lines
+        if progress_callback is not None and percent != last_percent:
+            last_percent = percent
+            progress_callback(i + 1, total_lines)
+
+        yield from line_sentences(line)
+
+
+def iter_file_sentences(file_path, chunk_size=CHUNK_SIZE, progress_callback=None):
+    """Stream (cleaned, processed, original) from a UTF-8 file without ever reading it whole.
+
+    Memory is bounded by chunk_size plus the longest line; progress_callback(done, total) gets byte counts.
+    """
+    total_bytes = os.path.getsize(file_path)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    done_bytes = 0
+    last_percent = -1
+
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            done_bytes += len(chunk)
+            lines = (pending + decoder.decode(chunk, final=not chunk)).splitlines(True)
+
+            # The last line may continue in the next chunk (or be the '\r' of a '\r\n' pair), so hold it back
+            pending = lines.pop() if chunk and lines else ''
+            for line in ascii_lines(''.join(lines)):
+                yield from line_sentences(line)
+
+            # Report progress only when the whole percentage changes, so callers are not flooded
+            percent = done_bytes * 100 // max(total_bytes, 1)
+            if progress_callback is not None and percent != last_percent:
+                last_percent = percent
+                progress_callback(done_bytes, total_bytes)
+
+            if not chunk:
+                break
@@ -0,0 +1,67 @@
+import re
+import sys
+import time
+
+from segmenter import ABBREVIATIONS, STOP_WORDS, iter_sentences
+
+
+def original_segment(content):
+    """The per-line regex loop preprocess used before segmenter.py, kept as the benchmark baseline."""
+    content = content.lower()
+    rows = []
+    abbrev_pattern = r'\b(?:' + '|'.join(ABBREVIATIONS) + r')\.$'
+    number_sentence_pattern = re.compile(r'(?<!\d)(\d+\.\d*)\s+(?=[A-Za-z])')
+    total_lines = len(content.splitlines())
+
+    for i, line in enumerate(content.splitlines()):
+        line = re.sub(r'[^\x00-\x7F]+', '', line)
+        line = re.sub(number_sentence_pattern, r'\1 ', line)
+        line = re.sub(r'(?<=\d)\s*\.\s*', '.', line)
+        for sentence in re.split(r'(?<=[.!?]) +', line):
+            sentence = sentence.strip()
+            if re.search(abbrev_pattern, sentence) or len(sentence.split()) < 3:
+                continue
+            if sentence.startswith(('=', '+', '-')):
+                sentence = "'" + sentence
+            cleaned_sentence = re.sub(r'[^a-zA-Z\s,.0-9()]', '', sentence)
+            cleaned_process = re.sub(r'[^a-zA-Z\s]', '', sentence)
+            cleaned_process = ' '.join([word for word in cleaned_process.split() if word not in STOP_WORDS and len(word) > 1])
+            rows.append((cleaned_process, cleaned_sentence.strip(), sentence))
+    return rows
+
+
+def throughput(segment, content, repeat):
+    # Best of several runs, in MB of UTF-8 input per second
+    size = len(content.encode('utf-8')) / 1e6
+    best = min(timed(segment, content) for _ in range(repeat))
+    return size / best
+
+
+def timed(segment, content):
+    start = time.perf_counter()
+    segment(content)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    # Usage: python segmenter_benchmark.py tos1.txt [tos2.txt ...] [--scale N]
+    args = sys.argv[1:]
+    scale = 1
+    if '--scale' in args:
+        i = args.index('--scale')
+        scale = int(args[i + 1])
+        del args[i:i + 2]
+
+    for path in args:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read() * scale
+
+        # Both implementations must agree before their speed is worth comparing
+        if original_segment(content) != list(iter_sentences(content)):
+            print(f"{path}: segmenter output differs from the original implementation")
+            sys.exit(1)
+
+        original = throughput(original_segment, content, 3)
+        segmented = throughput(lambda text: list(iter_sentences(text)), content, 3)
+        size = len(content.encode('utf-8')) / 1e6
+        print(f"{path} ({size:.2f} MB): original {original:.2f} MB/s, segmenter {segmented:.2f} MB/s ({segmented / original:.1f}x)")
@@ -0,0 +1,172 @@
+import hashlib
+import itertools
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Pipeline stages in execution order, with the stages each one reads and the result keys it produces
+STAGES = {
+    'preprocess': {'inputs': [], 'outputs': ['preprocess']},
+    'keywords': {'inputs': ['preprocess'], 'outputs': ['keywords']},
+    'nmf': {'inputs': ['preprocess'], 'outputs': ['nmf']},
+    'nmf_scores': {'inputs': ['preprocess', 'nmf'], 'outputs': ['nmf_scores', 'tfidf_nmf_scores']},
+    'surface_features': {'inputs': ['preprocess'], 'outputs': ['surface_features']},
+    'content_features': {'inputs': ['preprocess'], 'outputs': ['content_features']},
+    'rhetorical_features': {'inputs': ['preprocess'], 'outputs': ['rhetorical_features']},
+    'feature_scores': {'inputs': ['preprocess', 'surface_features', 'content_features', 'rhetorical_features'],
+                       'outputs': ['feature_scores']},
+    'extraction': {'inputs': ['preprocess', 'nmf_scores', 'feature_scores'], 'outputs': ['extraction', 'combinations']},
+    'summary': {'inputs': ['extraction'], 'outputs': ['summary', 'summary_ranks', 'summaries']}
+}
+
+# Threads for stages whose inputs are ready at the same time; NumPy, SciPy and sklearn release the GIL
+STAGE_WORKERS = 4
+
+
+def stage_settings(summarizer, stage, document, volatile):
+    """The settings a stage reads besides its input stages; any change makes its memoized output stale."""
+    if stage == 'preprocess':
+        return document['hash']
+    if stage in ('keywords', 'rhetorical_features'):
+        return summarizer.keywords
+    if stage == 'nmf':
+        # A warm-started family fit also depends on the previous revision, so it never matches a memo
+        family = document['family']
+        return [summarizer.nmf_config, summarizer.glove_version(), None if family is None else [family, next(volatile)]]
+    if stage == 'content_features':
+        return summarizer.glove_version()
+    if stage == 'extraction':
+        return summarizer.score_fusion.combinations
+    if stage == 'summary':
+        return [summarizer.summary_ratio, summarizer.summary_length]
+    return None
+
+
+def compute_stage(summarizer, stage, results, document):
+    """Run one stage on the results of its input stages and return its result keys."""
+    df = results.get('preprocess')
+    if stage == 'preprocess':
+        if document['file_path'] is not None:
+            return {'preprocess': summarizer.preprocess_file(document['file_path'], document['progress_callback'])}
+        return {'preprocess': summarizer.preprocess(document['content'], document['progress_callback'])}
+    if stage == 'keywords':
+        return {'keywords': summarizer.analyze_keywords(df)}
+    if stage == 'nmf':
+        return {'nmf': summarizer.perform_nmf(df, document['family'])}
+    if stage == 'nmf_scores':
+        nmf_grs_df, tfidf_grs_df = summarizer.calculate_nmf_score(df, results['nmf']['W'], results['nmf']['tfidf_W'])
+        return {'nmf_scores': nmf_grs_df, 'tfidf_nmf_scores': tfidf_grs_df}
+    if stage == 'surface_features':
+        return {'surface_features': summarizer.calculate_surface_features(df)}
+    if stage == 'content_features':
+        return {'content_features': summarizer.calculate_content_features(df)}
+    if stage == 'rhetorical_features':
+        return {'rhetorical_features': summarizer.calculate_rhetorical_features(df)}
+    if stage == 'feature_scores':
+        return {'feature_scores': summarizer.calculate_feature_score(df, results['surface_features'], results['content_features'],
+                                                                     results['rhetorical_features'])}
+    if stage == 'extraction':
+        extraction_df, combinations = summarizer.extract_sentences(df, results['nmf_scores'], results['feature_scores'],
+                                                                   results['tfidf_nmf_scores'])
+        return {'extraction': extraction_df, 'combinations': combinations}
+    if stage == 'summary':
+        summary_df, summaries = summarizer.select_summaries(results['extraction'], results['combinations'])
+        return {'summary': summary_df['Original Sentence'].tolist(), 'summary_ranks': summary_df, 'summaries': summaries}
+    raise ValueError(f"Unknown pipeline stage '{stage}'. Expected one of: {', '.join(STAGES)}.")
+
+
+def upstream_stages(targets):
+    """The targets and every stage they depend on, in execution order."""
+    needed = set()
+    pending = list(targets)
+    while pending:
+        stage = pending.pop()
+        if stage not in STAGES:
+            raise ValueError(f"Unknown pipeline stage '{stage}'. Expected one of: {', '.join(STAGES)}.")
+        if stage not in needed:
+            needed.add(stage)
+            pending.extend(STAGES[stage]['inputs'])
+    return [stage for stage in STAGES if stage in needed]
+
+
+class StageGraph:
+    """Runs pipeline stages in dependency order, reusing each stage's output while its fingerprint holds.
+
+    A stage's fingerprint hashes its own settings with the fingerprints of its input stages, so a change
+    anywhere upstream reaches every stage below it and nothing else. Stages whose inputs are ready at the
+    same time (NMF and the three feature stages, once pre-processing is done) run concurrently.
+    """
+
+    def __init__(self, summarizer, max_workers=STAGE_WORKERS):
+        if max_workers < 1:
+            raise ValueError(f"Stage workers must be at least 1, got {max_workers}.")
+        self.summarizer = summarizer
+        self.max_workers = max_workers
+        self.memo = {}  # stage -> (fingerprint, result keys) of its latest run
+        self.last_run = {}  # stage -> 'memoized' or 'computed' in the latest run
+        self.volatile = itertools.count()
+
+    def fingerprint(self, stage, document, fingerprints):
+        payload = json.dumps([stage, stage_settings(self.summarizer, stage, document, self.volatile),
+                              [fingerprints[name] for name in STAGES[stage]['inputs']]], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def run(self, targets, document, stage_callback=None):
+        """Bring the targets up to date for a document and return the results of every stage involved.
+
+        stage_callback(key, value) is called on the calling thread, in execution order, whatever order
+        the concurrent stages finish in.
+        """
+        order = upstream_stages(targets)
+        pending = list(order)
+        running = {}  # future -> stage
+        finished = {}  # stage -> result keys
+        fingerprints = {}
+        results = {}
+        reported = 0
+        self.last_run = {}
+
+        # With a single worker every stage runs inline, exactly like a serial pipeline
+        executor = ThreadPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else None
+        try:
+            while reported < len(order):
+                # Start every stage whose input stages are done; order is topological, so a memoized
+                # stage releases its dependents within the same pass
+                for stage in list(pending):
+                    if any(name not in finished for name in STAGES[stage]['inputs']):
+                        continue
+                    pending.remove(stage)
+                    fingerprints[stage] = self.fingerprint(stage, document, fingerprints)
+                    memo = self.memo.get(stage)
+                    if memo is not None and memo[0] == fingerprints[stage]:
+                        finished[stage] = memo[1]
+                        self.last_run[stage] = 'memoized'
+                        continue
+
+                    inputs = {key: value for name in STAGES[stage]['inputs'] for key, value in finished[name].items()}
+                    if executor is None:
+                        self.finish(stage, compute_stage(self.summarizer, stage, inputs, document), fingerprints, finished)
+                    else:
+                        running[executor.submit(compute_stage, self.summarizer, stage, inputs, document)] = stage
+
+                # Report finished stages in execution order, so callers see the same sequence as a serial run
+                while reported < len(order) and order[reported] in finished:
+                    for key, value in finished[order[reported]].items():
+                        results[key] = value
+                        if stage_callback is not None:
+                            stage_callback(key, value)
+                    reported += 1
+
+                if running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.finish(running.pop(future), future.result(), fingerprints, finished)
+        finally:
+            # On an error or a cancellation, drop the stages that have not started and let the running ones end
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        return results
+
+    def finish(self, stage, outputs, fingerprints, finished):
+        self.memo[stage] = (fingerprints[stage], outputs)
+        self.last_run[stage] = 'computed'
+        finished[stage] = outputs
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Modules timed on their own; the UI module is loaded by path because its file name has a hyphen
+MODULES = ['summarizer', 'batch', 'rouge_eval']
+UI_MODULE = 'ToS-Summarizer.py'
+
+LOAD_UI = f"""
+import importlib.util
+spec = importlib.util.spec_from_file_location('tos_summarizer', {UI_MODULE!r})
+ui = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ui)
+"""
+
+# Each snippet runs in a fresh interpreter and prints the seconds it took
+SNIPPETS = {
+    'import': "import time\nstart = time.perf_counter()\nimport {module}\nprint(time.perf_counter() - start)",
+    'import ui': "import time\nstart = time.perf_counter()\n" + LOAD_UI + "print(time.perf_counter() - start)",
+    'window': "import time\nstart = time.perf_counter()\n" + LOAD_UI + """
+app = ui.QApplication([])
+window = ui.ModernUI()
+window.show()
+app.processEvents()
+print(time.perf_counter() - start)
+""",
+    'first result': """
+import time
+start = time.perf_counter()
+from summarizer import Summarizer
+result = Summarizer({glove!r}).summarize(file_path={path!r})
+print(time.perf_counter() - start)
+"""
+}
+
+
+def timed(code, repeat):
+    # Best of several cold starts, measured inside the child so interpreter start-up noise is left out
+    env = dict(os.environ)
+    if not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    folder = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], cwd=folder, env=env, capture_output=True, text=True, check=True)
+        runs.append(float(output.stdout.strip().splitlines()[-1]))
+    return min(runs)
+
+
+def wall_time(command, repeat):
+    # Best of several runs of a whole command, interpreter start-up included
+    folder = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=folder, capture_output=True, check=True)
+        runs.append(time.perf_counter() - start)
+    return min(runs)
+
+
+if __name__ == "__main__":
+    # Usage: python startup_benchmark.py [tos.txt ...] [--glove vectors.txt] [--repeat N]
+    args = sys.argv[1:]
+    repeat = 3
+    glove = 'vectors.txt'
+    if '--repeat' in args:
+        i = args.index('--repeat')
+        repeat = int(args[i + 1])
+        del args[i:i + 2]
+    if '--glove' in args:
+        i = args.index('--glove')
+        glove = args[i + 1]
+        del args[i:i + 2]
+
+    for module in MODULES:
+        print(f"import {module}: {timed(SNIPPETS['import'].format(module=module), repeat):.3f} s")
+    print(f"import {UI_MODULE}: {timed(SNIPPETS['import ui'], repeat):.3f} s")
+    print(f"time to window: {timed(SNIPPETS['window'], repeat):.3f} s")
+
+    # The first summary pays for the deferred imports and the GloVe load as well
+    for path in args:
+        code = SNIPPETS['first result'].format(glove=os.path.abspath(glove), path=os.path.abspath(path))
+        print(f"time to first result ({path}): {timed(code, repeat):.3f} s")
+
+        # The same document through the command-line entry point, uncached, in one worker process
+        with tempfile.TemporaryDirectory() as out:
+            command = [sys.executable, 'tos_summarize.py', os.path.abspath(path), '--out', out, '--workers', '1',
+                       '--no-cache', '--glove', os.path.abspath(glove)]
+            print(f"tos_summarize.py first result ({path}): {wall_time(command, repeat):.3f} s")
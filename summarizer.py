@@ -0,0 +1,842 @@
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# scipy and sklearn are imported by the stages that use them, so importing the summarizer stays fast
+from glove_store import GloveStore, build_sentence_embeddings, glove_file_version, has_glove_store, load_glove_store, read_glove_text
+from keyword_matcher import KeywordMatcher
+from result_cache import hash_file, hash_glove_vectors, hash_text
+from score_fusion import ScoreFusion, top_k_indices
+from segmenter import CHUNK_SIZE, iter_file_sentences, iter_sentences
+from stage_graph import STAGE_WORKERS, STAGES, StageGraph
+
+
+KEYWORDS = {
+    "Obligations": ["needs", "required", "shall", "must", "compliance", "bound", "obligated", "agrees", "agreed", "agree", "committed", "commit", "duty", "responsible"],
+    "Rights": ["can", "may", "reserves", "right to", "right at", "permitted", "authority", "authorize", "entitled", "privilege"],
+    "Conditions": ["if", "provided", "subject to", "case", "unless", "otherwise", "under", "condition"],
+    "Exclusions of Liability": ["responsibility", "liable", "free", "liability", "excludes", "accountable", "disclaims"],
+    "Warranties and Disclaimers": ["warranty", "warranties", "guarantee", "guaranteed", "guarantees", "assurance"],
+    "Contrast/Concession": ["products and services", "but", "however", "even", "although", "notwithstanding", "despite", "spite", "nevertheless", "nonetheless", "contrast"],
+    "Cause and Effect": ["access to", "because", "result", "thus", "consequently", "since", "therefore", "consequence", "hence"],
+    "Addition": ["terms and conditions", "products or services", "also", "additionally", "as well as", "furthermore", "moreover", "besides"],
+    "Comparison/Similarity": ["way", "similar", "same", "similarly", "equally"],
+    "Condition": ["long as"],
+    "Purpose": ["in order", "time to time", "information that", "so that", "purpose", "goal", "objective", "intention", "aim"]
+}
+
+# Score combinations written to the Summary/ALL * folders, keyed by their per-document CSV name.
+# Each is a list of SCORE_COLUMNS summed with weight 1, or a {column: weight} dict for a weighted sum;
+# add or reweight combinations here or through Summarizer(combinations=...), see summary_folders()
+COMBINATIONS = {
+    'nmf.csv': ['NMF Score'],
+    'nmf+glove.csv': ['NMF GRS Score'],
+    'nmf+glove+rhetorical.csv': ['NMF GRS Score', 'Rhetorical Score'],
+    'nmf+glove+surface.csv': ['NMF GRS Score', 'Surface Score'],
+    'nmf+glove+content.csv': ['NMF GRS Score', 'Content Score'],
+    'nmf+glove+surface+content.csv': ['NMF GRS Score', 'Surface Score', 'Content Score'],
+    'nmf+glove+rhetorical+content.csv': ['NMF GRS Score', 'Rhetorical Score', 'Content Score'],
+    'nmf+glove+rhetorical+surface.csv': ['NMF GRS Score', 'Rhetorical Score', 'Surface Score'],
+    'nmf+rhetorical+surface+content.csv': ['Rhetorical Score', 'Surface Score', 'Content Score', 'NMF Score'],
+}
+
+# Share of the sentences kept in every summary; Summarizer(summary_length=...) asks for a fixed count instead
+SUMMARY_RATIO = 1 / 3
+
+# The overall extraction ranking, fused together with the combinations above
+OVERALL_SCORE = 'Overall Score'
+OVERALL_WEIGHTS = {'NMF GRS Score': 1.0, 'Overall Feature Score': 1.0}
+
+# Settings of the two NMF fits; override per deployment through Summarizer(nmf_config=...)
+# warm_max_iter caps warm-started refits of a revision, which start close to the optimum
+NMF_CONFIG = {
+    'tfidf': {'n_components': 30, 'init': 'random', 'solver': 'cd', 'beta_loss': 'frobenius', 'tol': 1e-4, 'max_iter': 3000, 'warm_max_iter': 200, 'random_state': 0},
+    'combined': {'n_components': 30, 'init': 'nndsvd', 'solver': 'cd', 'beta_loss': 'frobenius', 'tol': 1e-4, 'max_iter': 1000, 'warm_max_iter': 100, 'random_state': 0}
+}
+
+# Share of changed sentences above which a revision gets a full NMF refit instead of a warm start
+REFIT_DRIFT = 0.3
+
+# Summary/ALL * output folders and the combination each one is selected from
+SUMMARY_FOLDERS = {
+    'ALL 1 NMF': 'nmf.csv',
+    'ALL 2 NMF GLOVE': 'nmf+glove.csv',
+    'ALL 3 NMF GLOVE RHETORICAL': 'nmf+glove+rhetorical.csv',
+    'ALL 4 NMF GLOVE SURFACE': 'nmf+glove+surface.csv',
+    'ALL 5 NMF GLOVE CONTENT': 'nmf+glove+content.csv',
+    'ALL 6 NMF GLOVE SURFACE CONTENT': 'nmf+glove+surface+content.csv',
+    'ALL 7 NMF GLOVE RHETORICAL CONTENT': 'nmf+glove+rhetorical+content.csv',
+    'ALL 8 NMF GLOVE RHETORICAL SURFACE': 'nmf+glove+rhetorical+surface.csv',
+    'ALL 9 NMF RHETORICAL SURFACE CONTENT': 'nmf+rhetorical+surface+content.csv'
+}
+
+# Score columns of extract_sentences that a combination may sum
+SCORE_COLUMNS = ['NMF GRS Score', 'Overall Feature Score', 'Surface Score', 'Content Score', 'Rhetorical Score', 'NMF Score']
+
+# Folder holding the final summaries built from the overall extraction ranking
+FINAL_SUMMARY_FOLDER = 'ALL A NMF GLOVE RHETORICAL SURFACE CONTENT'
+
+# Debug dump file names for the intermediate results of each stage
+# Columns of the preprocessed sentence records, in the order the segmenter yields them
+PREPROCESS_COLUMNS = ['Cleaned Process', 'Processed Sentence', 'Original Sentence']
+
+ARTIFACTS = {
+    'preprocess': '1_preprocess_output.csv',
+    'keywords': '2_keyword_analysis.csv',
+    'nmf_scores': '4_NMF_GRSScores.csv',
+    'tfidf_nmf_scores': '4_TFIDF_NMF_GRSScores.csv',
+    'surface_features': '5_surface_features.csv',
+    'content_features': '5_content_features.csv',
+    'rhetorical_features': '5_rhetorical_features.csv',
+    'feature_scores': '6_feature_scores.csv',
+    'extraction': '7_sentence_extraction_results.csv'
+}
+
+NMF_ARTIFACTS = {
+    'tfidf_A': '3_tf-idf_A_matrix.csv',
+    'tfidf_W': '3_tf-idf_W_matrix.csv',
+    'tfidf_H': '3_tf-idf_H_matrix.csv',
+    'A': '3_A_matrix.csv',
+    'W': '3_W_matrix.csv',
+    'H': '3_H_matrix.csv',
+    'topics': 'topic_words.csv',
+    'telemetry': '3_nmf_telemetry.csv'
+}
+
+
+def summary_folders(combinations):
+    """{Summary/ALL * folder: combination} of the configured combinations, in the order of SUMMARY_FOLDERS.
+
+    Combinations without a numbered folder get one named after them, e.g. 'nmf+surface.csv' is written
+    to "ALL NMF SURFACE".
+    """
+    folders = {folder_name: csv_filename for folder_name, csv_filename in SUMMARY_FOLDERS.items() if csv_filename in combinations}
+    for csv_filename in combinations:
+        if csv_filename not in folders.values():
+            folder_name = 'ALL ' + ' '.join(os.path.splitext(csv_filename)[0].replace('+', ' ').upper().split())
+            if folder_name in folders or folder_name == FINAL_SUMMARY_FOLDER:
+                raise ValueError(f"Combination '{csv_filename}' would be written to the same folder '{folder_name}' "
+                                 f"as another one. Please rename it.")
+            folders[folder_name] = csv_filename
+    return folders
+
+
+def dump_artifacts(result, folder_path, keys=None):
+    """Write the intermediate stage results to CSV files for debugging."""
+    from scipy import sparse
+
+    os.makedirs(folder_path, exist_ok=True)
+    written = []
+    for key in (keys if keys is not None else list(result)):
+        if key not in result:
+            continue
+        if key in ARTIFACTS:
+            outputs = {ARTIFACTS[key]: result[key]}
+        elif key == 'nmf':
+            outputs = {NMF_ARTIFACTS[name]: value for name, value in result[key].items() if name in NMF_ARTIFACTS}
+        elif key == 'combinations':
+            outputs = result[key]
+        else:
+            continue
+
+        for csv_filename, value in outputs.items():
+            csv_path = os.path.join(folder_path, csv_filename)
+            if sparse.issparse(value):
+                # Sparse matrices are written as (Row, Column, Value) triplets of their non-zero entries
+                value = value.tocoo()
+                value = pd.DataFrame({'Row': value.row, 'Column': value.col, 'Value': value.data})
+            pd.DataFrame(value).to_csv(csv_path, index=False)
+            written.append(csv_path)
+    return written
+
+
+def save_summaries(result, input_filename, summary_folder="Summary"):
+    """Write the final summary and the top sentences of every combination to the Summary/ALL * folders."""
+    written = []
+
+    # Save the final summary sentences to a text file named based on the original filename
+    all_final_summary_folder = os.path.join(summary_folder, FINAL_SUMMARY_FOLDER)
+    os.makedirs(all_final_summary_folder, exist_ok=True)
+    final_summary_file_path = os.path.join(all_final_summary_folder, f"{input_filename}.txt")
+    with open(final_summary_file_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(result['summary']))
+    written.append(final_summary_file_path)
+
+    # Save the final summary ranks to a CSV file in the document folder
+    document_folder = os.path.join(summary_folder, input_filename)
+    os.makedirs(document_folder, exist_ok=True)
+    final_summary_csv_path = os.path.join(document_folder, f"{input_filename}.csv")
+    final_summary_df = result['summary_ranks']
+    final_summary_df[['Rank', 'Original Sentence']].rename(columns={'Original Sentence': 'Sentence'}).to_csv(final_summary_csv_path, index=False)
+    written.append(final_summary_csv_path)
+
+    for folder_name, top_df in result['summaries'].items():
+        # Create a folder for the current combination inside the Summary folder
+        output_folder = os.path.join(summary_folder, folder_name)
+        os.makedirs(output_folder, exist_ok=True)
+
+        # Save the top sentences to a new CSV file in the corresponding folder
+        output_csv_path = os.path.join(output_folder, f"{input_filename}.csv")
+        top_df.to_csv(output_csv_path, index=False)
+
+        # Save the top sentences to a text file without rank
+        output_txt_path = os.path.join(output_folder, f"{input_filename}.txt")
+        with open(output_txt_path, "w", encoding="utf-8") as txt_file:
+            txt_file.write("\n".join(top_df['Original Sentence'].tolist()))  # Write only sentences
+        written.extend([output_csv_path, output_txt_path])
+
+    return written
+
+
+def grs_scores(W):
+    """Global relevance score of every sentence: its topic weights in W weighted by each topic's share of W."""
+    W = np.asarray(W)
+    # Calculate weights for each topic (sum across sentences)
+    topic_weights = W.sum(axis=0) / W.sum()
+
+    # Row-wise reduction rather than a BLAS W @ topic_weights: BLAS may round identical rows differently
+    # depending on their alignment, which would break the ties between duplicate sentences in the ranking
+    return (W * topic_weights).sum(axis=1)
+
+
+def grs_frame(df, scores, message):
+    # Ensure there is a matching number of sentences
+    if len(df) < len(scores):
+        raise ValueError(message)
+
+    # Store the scores next to the cleaned and original sentences
+    return pd.DataFrame({
+        'Score': scores,
+        'Cleaned Process': df['Cleaned Process'].values[:len(scores)],
+        'Original Sentence': df['Original Sentence'].values[:len(scores)],
+    })
+
+
+class SummarizationCancelled(Exception):
+    """Raised from a progress or stage callback to abort a summarization run."""
+
+
+def load_glove_vectors(glove_file):
+    # Memory-map the binary store written by glove_store.py when it is available and up to date
+    if has_glove_store(glove_file):
+        return load_glove_store(glove_file)
+    vocab, vectors = read_glove_text(glove_file)
+    return GloveStore(vocab, vectors)
+
+
+class Summarizer:
+    """Headless extractive summarizer; every stage works on in-memory DataFrames and arrays."""
+
+    def __init__(self, glove_file='vectors.txt', glove_vectors=None, keywords=None, nmf_config=None, refit_drift=REFIT_DRIFT,
+                 combinations=None, summary_ratio=SUMMARY_RATIO, summary_length=None, cache=None, embedding_version=None,
+                 stage_workers=STAGE_WORKERS):
+        self.glove_file = glove_file
+        self.glove_vectors = glove_vectors  # To store GloVe vectors
+        self.external_vectors = glove_vectors is not None
+        self.keywords = dict(keywords) if keywords is not None else dict(KEYWORDS)
+        self.keyword_matcher = KeywordMatcher(self.keywords)
+
+        # Per-fit NMF settings, with any overrides merged over the defaults
+        self.nmf_config = {name: dict(settings) for name, settings in NMF_CONFIG.items()}
+        for name, settings in (nmf_config or {}).items():
+            if name not in self.nmf_config:
+                raise ValueError(f"Unknown NMF fit '{name}'. Expected one of: {', '.join(self.nmf_config)}.")
+            # Reject typos now rather than as a TypeError from NMF(**settings) after the other stages ran;
+            # sklearn is only imported when a setting outside the defaults needs checking
+            new_keys = [key for key in settings if key not in self.nmf_config[name]]
+            if new_keys:
+                from sklearn.decomposition import NMF
+
+                supported = set(NMF().get_params()) | {'warm_max_iter'}
+                unknown = [key for key in new_keys if key not in supported]
+                if unknown:
+                    raise ValueError(f"Unknown setting(s) {', '.join(unknown)} for NMF fit '{name}'. "
+                                     f"Expected some of: {', '.join(sorted(supported))}.")
+            self.nmf_config[name].update(settings)
+
+        # Every combination plus the overall ranking is scored in one ScoreFusion pass. Names and columns
+        # are checked now rather than failing as a KeyError after both NMF fits ran.
+        self.combinations = dict(combinations) if combinations is not None else dict(COMBINATIONS)
+        for csv_filename, spec in self.combinations.items():
+            if not isinstance(csv_filename, str) or not csv_filename.endswith('.csv') or csv_filename == '.csv' \
+                    or os.path.basename(csv_filename) != csv_filename:
+                raise ValueError(f"Combination name '{csv_filename}' must be a CSV file name, e.g. 'nmf+surface.csv'.")
+            if not spec:
+                raise ValueError(f"Combination '{csv_filename}' has no score columns.")
+            unknown = [column for column in spec if column not in SCORE_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown score column(s) {', '.join(map(str, unknown))} in combination '{csv_filename}'. "
+                                 f"Expected some of: {', '.join(SCORE_COLUMNS)}.")
+        self.summary_folders = summary_folders(self.combinations)
+        self.score_fusion = ScoreFusion({**self.combinations, OVERALL_SCORE: OVERALL_WEIGHTS})
+
+        # Summary size, as a share of the sentences or as an absolute number of sentences
+        if not 0 < summary_ratio <= 1:
+            raise ValueError(f"Summary ratio must be in (0, 1], got {summary_ratio}.")
+        if summary_length is not None and summary_length < 1:
+            raise ValueError(f"Summary length must be at least 1 sentence, got {summary_length}.")
+        self.summary_ratio = summary_ratio
+        self.summary_length = summary_length
+
+        # Memoized stage outputs of the latest document, invalidated by input fingerprints; independent
+        # stages run on stage_workers threads, which share the lazily built state below under this lock
+        self.stages = StageGraph(self, stage_workers)
+        self.lock = threading.RLock()
+
+        # Previous NMF factors per document family, used to warm-start revisions of the same policy
+        self.nmf_families = {}
+        self.refit_drift = refit_drift
+        self.embedding_cache = None  # (cleaned sentences, embeddings, valid word counts) of the last document
+
+        # Optional ResultCache of finished documents, keyed by text, settings and embedding version
+        self.cache = cache
+        self.embedding_version = embedding_version
+
+    def ensure_glove_vectors(self):
+        # Load GloVe vectors if not already loaded
+        with self.lock:
+            if self.glove_vectors is None:
+                self.glove_vectors = load_glove_vectors(self.glove_file)
+            elif not isinstance(self.glove_vectors, GloveStore):
+                # Plain {word: vector} dicts are packed into one matrix for the vectorized stages
+                self.glove_vectors = GloveStore(list(self.glove_vectors.keys()), np.array(list(self.glove_vectors.values()), dtype=float))
+            return self.glove_vectors
+
+    def glove_version(self):
+        """Fingerprint of the GloVe vectors, so cached results go stale when the embeddings change."""
+        if self.embedding_version is None:
+            if not self.external_vectors and (os.path.exists(self.glove_file) or has_glove_store(self.glove_file)):
+                # Vectors loaded from a file are identified by the files actually loaded, without loading them
+                self.embedding_version = glove_file_version(self.glove_file)
+            else:
+                self.embedding_version = hash_glove_vectors(self.ensure_glove_vectors())
+        return self.embedding_version
+
+    def config_fingerprint(self):
+        # Every setting that changes the scores or the summaries
+        return {
+            'keywords': self.keywords,
+            'nmf_config': self.nmf_config,
+            'combinations': self.score_fusion.combinations,
+            'summary_ratio': self.summary_ratio,
+            'summary_length': self.summary_length
+        }
+
+    def cache_key(self, document_hash):
+        return self.cache.key(document_hash, self.config_fingerprint(), self.glove_version())
+
+    def matcher(self):
+        # Rebuild the keyword trie when the keyword dict was changed in place, e.g. through ModernUI.keywords
+        with self.lock:
+            if self.keyword_matcher.keywords != self.keywords:
+                self.keyword_matcher = KeywordMatcher(self.keywords)
+            return self.keyword_matcher
+
+    def sentence_embeddings(self, df):
+        """Mean GloVe vector of every cleaned sentence, cached so NMF and content features share it."""
+        glove_vectors = self.ensure_glove_vectors()
+        cleaned_sentences = tuple(df['Cleaned Process'].fillna('').astype(str))
+
+        # NMF and content features ask concurrently; the second waits for the first and reuses its embeddings
+        with self.lock:
+            if self.embedding_cache is None or self.embedding_cache[0] != cleaned_sentences:
+                embeddings, valid_counts = build_sentence_embeddings(cleaned_sentences, glove_vectors)
+                self.embedding_cache = (cleaned_sentences, embeddings, valid_counts)
+            return self.embedding_cache[1], self.embedding_cache[2]
+
+    def preprocess(self, content, progress_callback=None):
+        if not content:
+            raise ValueError("No content to process. Please upload a file first.")
+
+        # Ensure content is a string before applying string methods
+        if not isinstance(content, str):
+            content = str(content)
+
+        # Segment and clean every sentence in one pass over the text
+        df = pd.DataFrame(list(iter_sentences(content, progress_callback)), columns=PREPROCESS_COLUMNS)
+
+        # Only keep non-empty processed sentences
+        return df[df['Processed Sentence'] != ''].reset_index(drop=True)
+
+    def iter_preprocess_file(self, file_path, progress_callback=None, chunk_size=CHUNK_SIZE):
+        """Yield the preprocessed (cleaned, processed, original) records of a file, reading it in chunks."""
+        for record in iter_file_sentences(file_path, chunk_size, progress_callback):
+            # Only keep non-empty processed sentences
+            if record[1]:
+                yield record
+
+    def preprocess_file(self, file_path, progress_callback=None, chunk_size=CHUNK_SIZE):
+        """Preprocess a file without loading its raw text; only the sentence records are kept."""
+        if os.path.getsize(file_path) == 0:
+            raise ValueError("No content to process. Please upload a file first.")
+
+        return pd.DataFrame(list(self.iter_preprocess_file(file_path, progress_callback, chunk_size)), columns=PREPROCESS_COLUMNS)
+
+    def analyze_keywords(self, df):
+        if df.empty:
+            raise ValueError("No sentences left after preprocessing. The document may be empty or hold only very short lines.")
+
+        # Ensure every cleaned process sentence is a string, NaN becomes an empty string
+        cleaned_sentences = df['Cleaned Process'].fillna('').astype(str).tolist()
+
+        # Count whole-word and phrase occurrences of every keyword category in one pass
+        counts, _ = self.matcher().match(cleaned_sentences)
+
+        # Prepare the keyword categories found in each sentence with counts
+        categories = self.matcher().categories
+        keywords_found = [[f"{categories[c]} ({row[c]})" for c in np.flatnonzero(row)] for row in counts]
+
+        return pd.DataFrame({
+            "Total Keywords": [len(found) for found in keywords_found],
+            "Keywords Found": [", ".join(found) if found else "None" for found in keywords_found],
+            "Cleaned Process": cleaned_sentences,
+            "Original Sentence": df['Original Sentence'].tolist()
+        })
+
+    def fit_nmf(self, name, matrix, n_components=None, W=None, H=None):
+        """Fit one configured NMF model, warm-started from W/H when given, and record how the fit went."""
+        settings = dict(self.nmf_config[name])
+        warm_max_iter = settings.pop('warm_max_iter')
+        if n_components is not None:
+            settings['n_components'] = n_components
+        if W is not None:
+            settings['init'] = 'custom'
+            settings['n_components'] = H.shape[0]
+            settings['max_iter'] = warm_max_iter
+
+        from sklearn.decomposition import NMF
+
+        start = time.perf_counter()
+        model = NMF(**settings)
+        if W is not None:
+            W = model.fit_transform(matrix, W=W, H=H)
+        else:
+            W = model.fit_transform(matrix)
+        elapsed = time.perf_counter() - start
+
+        telemetry = {
+            'Fit': name,
+            'Mode': 'warm' if settings['init'] == 'custom' else 'full',
+            'Solver': settings['solver'],
+            'Beta Loss': settings['beta_loss'],
+            'Init': settings['init'],
+            'Components': settings['n_components'],
+            'Iterations': model.n_iter_,
+            'Max Iterations': settings['max_iter'],
+            'Converged': model.n_iter_ < settings['max_iter'],
+            'Reconstruction Error': model.reconstruction_err_,
+            'Seconds': elapsed
+        }
+        return model, W, telemetry
+
+    def revision_drift(self, previous_sentences, sentences):
+        # Share of sentences that are new in this revision or gone from the previous one, whichever is larger
+        previous_counts = Counter(previous_sentences)
+        counts = Counter(sentences)
+        common = sum((previous_counts & counts).values())
+        return max(1 - common / max(len(sentences), 1), 1 - common / max(len(previous_sentences), 1))
+
+    def warm_start_factors(self, state, rows, sentences, matrix):
+        # Unchanged sentences keep their previous W rows; new ones get rows from a cheap transform against the previous H
+        model = state['model']
+        W = np.zeros((len(sentences), model.components_.shape[0]))
+        new_rows = []
+        for i, sentence in enumerate(sentences):
+            if sentence in rows:
+                W[i] = state['W'][rows[sentence]]
+            else:
+                new_rows.append(i)
+        if new_rows:
+            W[new_rows] = model.transform(matrix[new_rows])
+        return W, model.components_.copy()
+
+    def perform_nmf(self, df, family=None):
+        """Fit both NMF models; with a family key, revisions of the same policy warm-start from the previous fit."""
+        from scipy import sparse
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        glove_vectors = self.ensure_glove_vectors()
+
+        if df.empty:
+            raise ValueError("No sentences left after preprocessing. The document may be empty or hold only very short lines.")
+
+        cleaned_sentences = df['Cleaned Process'].fillna('').astype(str).tolist()  # Fill NaNs with empty strings
+
+        # Warm-start only while the revision has not drifted too far from the last full fit of its family.
+        # Drift is measured against that fit, not the previous revision, so a chain of small edits adds up;
+        # its vocabulary is frozen in the warm vectorizer, and new terms only enter with the next full refit
+        previous = self.nmf_families.get(family) if family is not None else None
+        drift = self.revision_drift(previous['baseline'], cleaned_sentences) if previous is not None else 1.0
+        warm = previous is not None and drift <= self.refit_drift
+        previous_rows = {}
+        if warm:
+            for i, sentence in enumerate(previous['sentences']):
+                previous_rows.setdefault(sentence, i)
+
+        # ===================== NMF ALONE (TF-IDF) PROCESS =====================
+
+        # TF-IDF Vectorization; a warm start reuses the previous vocabulary so the columns line up with H
+        # The matrix stays sparse end to end; TF-IDF weights are never negative, so no shift is needed
+        if warm:
+            tfidf_vectorizer = previous['vectorizer']
+            tfidf_A_matrix = tfidf_vectorizer.transform(cleaned_sentences)
+        else:
+            tfidf_vectorizer = TfidfVectorizer()
+            tfidf_A_matrix = tfidf_vectorizer.fit_transform(cleaned_sentences)
+
+        # Apply NMF on TF-IDF matrix (NMF Alone)
+        if warm:
+            W0, H0 = self.warm_start_factors(previous['tfidf'], previous_rows, cleaned_sentences, tfidf_A_matrix)
+            tfidf_model, tfidf_W, tfidf_telemetry = self.fit_nmf('tfidf', tfidf_A_matrix, W=W0, H=H0)
+        else:
+            tfidf_model, tfidf_W, tfidf_telemetry = self.fit_nmf('tfidf', tfidf_A_matrix)
+        tfidf_H = tfidf_model.components_
+
+        # ===================== NMF + GloVe PROCESS =====================
+
+        # Input matrix A holds the averaged GloVe vector of each cleaned sentence (zero if no word matched)
+        embeddings, _ = self.sentence_embeddings(df)
+        A_matrix = embeddings.copy()  # The shift below must not touch the shared embeddings
+
+        # Check if A_matrix is empty
+        if A_matrix.size == 0:
+            raise ValueError("GloVe matrix (A_matrix) is empty. Please check the GloVe embeddings or input sentences.")
+
+        # Apply additive shift to make all values non-negative
+        min_value = np.min(A_matrix)  # Find the minimum value in the matrix
+        if min_value < 0:
+            A_matrix += np.abs(min_value)  # Shift the entire matrix so the smallest value becomes 0
+
+        # Check if the TF-IDF matrix (tfidf_W) is valid
+        if tfidf_W is None or tfidf_W.size == 0:
+            raise ValueError("TF-IDF matrix is empty or invalid. Please check the pre-processing step.")
+
+        # Combine the NMF (TF-IDF) W matrix with GloVe embeddings (concatenation)
+        # Dense GloVe columns next to the sparse TF-IDF columns, kept in CSR form for NMF
+        combined_matrix = sparse.hstack((sparse.csr_matrix(A_matrix), tfidf_A_matrix), format='csr')
+
+        # Proceed with NMF processing after validating that combined_matrix exists
+        if combined_matrix.shape[0] == 0 or combined_matrix.shape[1] == 0:
+            raise ValueError("Combined matrix is empty. Cannot proceed with NMF.")
+
+        # Apply NMF to the combined matrix (NMF + GloVe)
+        n_samples, n_features = combined_matrix.shape
+        n_components = min(self.nmf_config['combined']['n_components'], min(n_samples, n_features))  # Ensure valid n_components
+
+        if warm:
+            W0, H0 = self.warm_start_factors(previous['combined'], previous_rows, cleaned_sentences, combined_matrix)
+            model, W, combined_telemetry = self.fit_nmf('combined', combined_matrix, W=W0, H=H0)
+        else:
+            model, W, combined_telemetry = self.fit_nmf('combined', combined_matrix, n_components)
+        H = model.components_
+
+        # Keep the factors so the next revision of this family can warm-start from them
+        if family is not None:
+            self.nmf_families[family] = {
+                'baseline': previous['baseline'] if warm else cleaned_sentences,
+                'sentences': cleaned_sentences,
+                'vectorizer': tfidf_vectorizer,
+                'tfidf': {'model': tfidf_model, 'W': tfidf_W},
+                'combined': {'model': model, 'W': W}
+            }
+
+        # Prepare to extract top words for each topic
+        vocab = list(glove_vectors.keys())
+        n_top_words = 10  # Number of top words to display per topic
+        topics = {}
+
+        for topic_idx, topic in enumerate(H):
+            top_word_indices = topic.argsort()[-n_top_words:][::-1]  # Get indices of top words
+            top_words = [vocab[i] for i in top_word_indices if i < len(vocab)]  # Get the actual words
+            topics[f'Topic {topic_idx + 1}'] = top_words
+
+        # Convert the topics dictionary to a DataFrame
+        topics_df = pd.DataFrame.from_dict(topics, orient='index').transpose()
+
+        return {
+            'tfidf_A': tfidf_A_matrix,
+            'tfidf_W': tfidf_W,
+            'tfidf_H': tfidf_H,
+            'A': A_matrix,
+            'W': W,
+            'H': H,
+            'topics': topics_df,
+            'telemetry': pd.DataFrame([tfidf_telemetry, combined_telemetry]).assign(Drift=drift)
+        }
+
+    def calculate_nmf_score(self, df, W, tfidf_W):
+        # Scoring for GloVe + NMF and for TF-IDF NMF, straight from the in-memory W factors
+        grs_df = grs_frame(df, grs_scores(W), "Mismatch between number of sentences and calculated scores.")
+        tfidf_grs_df = grs_frame(df, grs_scores(tfidf_W), "Mismatch between number of sentences and calculated TF-IDF scores.")
+        return grs_df, tfidf_grs_df
+
+    def calculate_surface_features(self, df):
+        # Ensure there are sentences to process
+        if df.empty:
+            raise ValueError("No sentences left after preprocessing. The document may be empty or hold only very short lines.")
+
+        # Extract cleaned and original sentences
+        cleaned_sentences = df['Cleaned Process'].fillna('').astype(str).tolist()
+        original_sentences = df['Original Sentence'].tolist()
+
+        position_scores = []
+        length_scores = []
+        final_scores = []
+
+        # Calculate position and length scores for the preprocessed sentences
+        for i, sentence in enumerate(cleaned_sentences):
+            position_score = 1 / (i + 1)  # Position score (higher for earlier sentences)
+            length = len(sentence.split())  # Calculate the length of the sentence (in words)
+
+            # Calculate length score, capping it at 5 points
+            if length <= 5:
+                length_score = 0  # No points for short sentences
+            else:
+                length_score = min(5, (length - 5))  # Max length score of 5 for sentences longer than 5 words
+
+            # Average the position and length scores to get the final score
+            final_score = position_score + length_score
+
+            # Append scores for the sentence
+            position_scores.append(position_score)
+            length_scores.append(length_score)
+            final_scores.append(final_score)
+
+        # Prepare the DataFrame with the specified order
+        return pd.DataFrame({
+            'Final Score': final_scores,
+            'Position Score': position_scores,
+            'Length Score': length_scores,
+            'Cleaned Sentence': cleaned_sentences,
+            'Original Sentence': original_sentences
+        })
+
+    def calculate_content_features(self, df):
+        from sklearn.metrics.pairwise import cosine_similarity
+        from sklearn.preprocessing import normalize
+
+        glove_vectors = self.ensure_glove_vectors()
+
+        # Extract cleaned and original sentences
+        cleaned_sentences = df['Cleaned Process'].fillna('').astype(str).tolist()
+        original_sentences = df['Original Sentence'].tolist()
+
+        if not cleaned_sentences:
+            raise ValueError("No sentences left after preprocessing. The document may be empty or hold only very short lines.")
+
+        # Calculate the document centroid by averaging the sentence vectors that had known words
+        embeddings, valid_counts = self.sentence_embeddings(df)
+        has_vector = valid_counts > 0
+        if has_vector.any():
+            document_vector = embeddings[has_vector].mean(axis=0)
+        else:
+            document_vector = np.zeros(embeddings.shape[1])
+
+        # Cosine similarity of every sentence vector with the centroid, normalized by sentence length
+        sentence_lengths = np.array([len(sentence.split()) for sentence in cleaned_sentences])
+        centroid_scores = (cosine_similarity(embeddings, [document_vector])[:, 0] / np.maximum(sentence_lengths, 1)).tolist()
+
+        # Count word frequencies across the entire text for high-frequency word score
+        word_frequencies = Counter()
+        for sentence in cleaned_sentences:
+            word_frequencies.update(sentence.split())
+
+        # Top 10 high-frequency words that have a GloVe vector, computed once for the document
+        top_words = [(word, count) for word, count in word_frequencies.most_common(10) if word in glove_vectors]
+
+        # Each known word is worth its frequency plus its frequency-weighted cosine similarity
+        # with the top words, computed with one normalized matmul over the unique vocabulary
+        known_words = [word for word in word_frequencies if word in glove_vectors]
+        word_values = {}
+        if known_words:
+            word_matrix = normalize(np.array([glove_vectors[word] for word in known_words], dtype=float))
+            similarity_sums = np.zeros(len(known_words))
+            if top_words:
+                top_matrix = normalize(np.array([glove_vectors[word] for word, _ in top_words], dtype=float))
+                top_counts = np.array([count for _, count in top_words], dtype=float)
+                similarity_sums = (word_matrix @ top_matrix.T) @ top_counts
+            word_values = dict(zip(known_words, np.array([word_frequencies[word] for word in known_words]) + similarity_sums))
+
+        # High-frequency word score of a sentence: mean value over its words (unknown words count as 0)
+        high_frequency_word_scores = []
+        for sentence in cleaned_sentences:
+            words = sentence.split()
+            high_frequency_score = 0
+            if len(words) > 0:
+                high_frequency_score = float(sum(word_values.get(word, 0) for word in words)) / len(words)
+            high_frequency_word_scores.append(high_frequency_score)
+
+        # Normalize the high-frequency word scores
+        max_high_frequency_score = max(high_frequency_word_scores) if high_frequency_word_scores else 1
+        if max_high_frequency_score > 0:
+            high_frequency_word_scores = [score / max_high_frequency_score * 5 for score in high_frequency_word_scores]
+
+        # Compute the final score as a weighted average
+        final_scores = [(centroid_score + high_frequency_score)
+                        for centroid_score, high_frequency_score in zip(centroid_scores, high_frequency_word_scores)]
+
+        # Prepare the DataFrame with the specified order
+        return pd.DataFrame({
+            'Final Score': final_scores,
+            'Centroid Score': centroid_scores,
+            'High Frequency Word Score': high_frequency_word_scores,
+            'Cleaned Sentence': cleaned_sentences,
+            'Original Sentence': original_sentences
+        })
+
+    def calculate_rhetorical_features(self, df):
+        # Extract cleaned and original sentences
+        cleaned_sentences = df['Cleaned Process'].fillna('').astype(str).tolist()
+        original_sentences = df['Original Sentence'].tolist()
+
+        if not cleaned_sentences:
+            raise ValueError("No sentences left after preprocessing. The document may be empty or hold only very short lines.")
+
+        # The final score is simply the number of keyword phrases in the sentence
+        _, keyword_counts = self.matcher().match(cleaned_sentences)
+
+        return pd.DataFrame({
+            "Final Score": keyword_counts,
+            "Total Keywords Count": keyword_counts,
+            "Cleaned Sentence": cleaned_sentences,
+            "Original Sentence": original_sentences
+        })
+
+    def calculate_feature_score(self, df, surface_df, content_df, rhetorical_df):
+        # Ensure the dataframes have the same number of rows
+        if not (len(surface_df) == len(content_df) == len(rhetorical_df) == len(df)):
+            raise ValueError("Mismatch in sentence counts between feature scores.")
+
+        # Combine the scores into a single dataframe
+        combined_df = pd.DataFrame({
+            'Surface Score': surface_df['Final Score'],
+            'Content Score': content_df['Final Score'],
+            'Rhetorical Score': rhetorical_df['Final Score'],
+            'Cleaned Sentence': df['Cleaned Process'],
+            'Original Sentence': df['Original Sentence']
+        })
+
+        # Calculate the overall feature score as the sum of the three scores
+        combined_df['Overall Feature Score'] = combined_df[['Surface Score', 'Content Score', 'Rhetorical Score']].sum(axis=1)
+
+        # Reorder columns to place 'Overall Feature Score' first
+        return combined_df[['Overall Feature Score', 'Surface Score', 'Content Score', 'Rhetorical Score', 'Cleaned Sentence', 'Original Sentence']]
+
+    def extract_sentences(self, df, nmf_grs_df, feature_df, tfidf_grs_df):
+        # Ensure both dataframes have the same number of sentences
+        if len(nmf_grs_df) != len(feature_df):
+            raise ValueError("Mismatch in the number of sentences between NMF GRS Scores and Feature Scores.")
+
+        if len(tfidf_grs_df) != len(feature_df):
+            raise ValueError("Mismatch in the number of sentences between TF-IDF W matrix and Feature Scores.")
+
+        # Check if the number of rows matches across all three dataframes
+        if len(nmf_grs_df) != len(df):
+            raise ValueError("Mismatch in the number of sentences between NMF GRS Scores and Preprocessed Output.")
+
+        # Create a new DataFrame using scores from both dataframes and adding original sentences
+        combined_df = pd.DataFrame({
+            'Sentence': df['Cleaned Process'],  # Use cleaned sentences
+            'Original Sentence': df['Original Sentence'],  # Add the original sentence column
+            'NMF GRS Score': nmf_grs_df['Score'],
+            'Overall Feature Score': feature_df['Overall Feature Score'],
+            'Surface Score': feature_df['Surface Score'],
+            'Content Score': feature_df['Content Score'],
+            'Rhetorical Score': feature_df['Rhetorical Score'],
+            'NMF Score': tfidf_grs_df['Score']
+        })
+
+        # Total Score and dense Rank of every combination and of the overall ranking in one pass
+        totals, ranks = self.score_fusion.fuse(combined_df)
+        fused = {name: k for k, name in enumerate(self.score_fusion.names)}
+
+        # Individual frames for the different combinations
+        combinations = {}
+        for csv_filename in self.combinations:
+            columns = list(self.score_fusion.combinations[csv_filename])
+            combination_df = combined_df[['Sentence', 'Original Sentence'] + columns].copy()
+            combination_df['Total Score'] = totals[:, fused[csv_filename]]
+            combination_df['Rank'] = ranks[:, fused[csv_filename]]
+            combinations[csv_filename] = combination_df
+
+        # Overall results in the original order with the newly added rank
+        extraction_df = combined_df[['Sentence', 'Original Sentence', 'NMF GRS Score', 'Overall Feature Score',
+                                     'Surface Score', 'Content Score', 'Rhetorical Score']].copy()
+        extraction_df['Overall Score'] = totals[:, fused[OVERALL_SCORE]]
+        extraction_df['Rank'] = ranks[:, fused[OVERALL_SCORE]]
+
+        return extraction_df, combinations
+
+    def summary_size(self, sentence_count):
+        # Calculate the number of sentences to include in the summary (top 1/3 by default)
+        if self.summary_length is not None:
+            return min(self.summary_length, sentence_count)
+        # The epsilon keeps e.g. 273 * (1 / 3) from flooring to 90
+        return int(sentence_count * self.summary_ratio + 1e-9)
+
+    def top_sentences(self, ranked_df):
+        # Exactly summary_size sentences with the best ranks, kept in document order
+        return ranked_df.iloc[top_k_indices(-ranked_df['Rank'].to_numpy(), self.summary_size(len(ranked_df)))]
+
+    def select_summaries(self, extraction_df, combinations):
+        # Keep the top sentences of the overall ranking and of every combination
+        summary_df = self.top_sentences(extraction_df)
+        summaries = {folder_name: self.top_sentences(combinations[csv_filename])
+                     for folder_name, csv_filename in self.summary_folders.items()}
+        return summary_df, summaries
+
+    def document_hash(self, content=None, file_path=None):
+        return hash_file(file_path) if file_path is not None else hash_text(content or '')
+
+    def run_stages(self, targets, content=None, progress_callback=None, family=None, stage_callback=None, file_path=None,
+                   document_hash=None):
+        """Bring the target stages up to date for a document, reusing every stage whose inputs did not change.
+
+        Returns the results of the targets and of all stages they depend on.
+        """
+        document = {
+            'content': content,
+            'file_path': file_path,
+            'hash': document_hash if document_hash is not None else self.document_hash(content, file_path),
+            'progress_callback': progress_callback,
+            'family': family
+        }
+        return self.stages.run(targets, document, stage_callback)
+
+    def summarize(self, content=None, progress_callback=None, artifacts_folder=None, family=None, stage_callback=None, file_path=None):
+        """Run every stage on a document string, or a file streamed from disk, and return all intermediate results.
+
+        stage_callback(key, value) is called as each result becomes available; raising
+        SummarizationCancelled from it (or from progress_callback) aborts the run between stages.
+        """
+        # Finished results of an unchanged document come straight from the cache. Warm-started family
+        # runs depend on the previous revision as well, so they always run and are not cached.
+        cache_key = None
+        document_hash = None
+        if self.cache is not None and family is None:
+            document_hash = self.document_hash(content, file_path)
+            cache_key = self.cache_key(document_hash)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                for key, value in cached.items():
+                    if stage_callback is not None:
+                        stage_callback(key, value)
+                if artifacts_folder is not None:
+                    dump_artifacts(cached, artifacts_folder)
+                return cached
+
+        result = self.run_stages(list(STAGES), content, progress_callback, family, stage_callback, file_path, document_hash)
+
+        # Cache everything but the NMF factors, which are large and only needed for warm starts
+        if cache_key is not None:
+            self.cache.put(cache_key, {key: value for key, value in result.items() if key != 'nmf'})
+
+        # Optional debug dump of every intermediate result
+        if artifacts_folder is not None:
+            dump_artifacts(result, artifacts_folder)
+
+        return result
@@ -0,0 +1,131 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from batch import batch_summarize
+from result_cache import ResultCache
+from summarizer import Summarizer
+
+# Summarizer settings a --config JSON file may set
+CONFIG_KEYS = ['glove_file', 'keywords', 'nmf_config', 'refit_drift', 'combinations', 'summary_ratio', 'summary_length']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='tos-summarize',
+        description="Summarize Terms of Service files headless and write the same Summary/ALL * outputs as the UI.")
+    parser.add_argument('inputs', nargs='+', help="text files or glob patterns, e.g. 'input/*.txt'")
+    parser.add_argument('--out', default='Summary', help="summary folder (default: Summary)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--config', help="JSON file with Summarizer settings: " + ', '.join(CONFIG_KEYS))
+    parser.add_argument('--glove', default=None, help="GloVe vectors file (default: vectors.txt, or glove_file in the config)")
+    parser.add_argument('--cache', default='.summary_cache', help="result cache folder (default: .summary_cache)")
+    parser.add_argument('--no-cache', action='store_true', help="always recompute, without reading or writing the cache")
+    parser.add_argument('--artifacts', action='store_true', help="also write every intermediate result per document")
+    parser.add_argument('--family', action='store_true',
+                        help="treat the inputs as successive revisions of one policy, in the order given, and warm-start "
+                             "each NMF fit from the previous revision (run on one worker, not cached)")
+    parser.add_argument('--json', action='store_true', help="print one JSON object per document and a final summary object")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error(f"--workers must be at least 1, got {args.workers}")
+    return args
+
+
+def input_files(patterns):
+    """Expand the patterns the shell did not (quoted, or on Windows), keeping their order and dropping repeats.
+
+    Raises ValueError when two different files share a name, since their Summary outputs would collide.
+    """
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise ValueError(f"No input files match '{pattern}'.")
+        files.extend(matches)
+
+    # The same file under two spellings (input/a.txt, ./input/a.txt) counts once
+    unique = {}
+    for file_path in files:
+        unique.setdefault(os.path.abspath(file_path), file_path)
+    files = list(unique.values())
+
+    # Outputs are named after the file name alone, so a/terms.txt and b/terms.txt would overwrite each other
+    by_name = {}
+    for file_path in files:
+        by_name.setdefault(os.path.splitext(os.path.basename(file_path))[0], []).append(file_path)
+    repeated = {name: paths for name, paths in by_name.items() if len(paths) > 1}
+    if repeated:
+        clashes = '; '.join(f"{name}: {', '.join(paths)}" for name, paths in repeated.items())
+        raise ValueError(f"Input files share a name and would write the same Summary outputs ({clashes}). "
+                         f"Please summarize them in separate runs or into separate --out folders.")
+    return files
+
+
+def load_config(config_path):
+    if config_path is None:
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"Config {config_path} must hold a JSON object.")
+    unknown = [key for key in config if key not in CONFIG_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown config setting(s) {', '.join(unknown)}. Expected some of: {', '.join(CONFIG_KEYS)}.")
+    return config
+
+
+def report(result, as_json):
+    # Flushed per document, so a cron log or a pipe sees each one as it finishes
+    if as_json:
+        print(json.dumps({key: result[key] for key in ('file', 'name', 'sentences', 'seconds', 'error')}
+                         | {'summary_sentences': len(result['summary'])}), flush=True)
+    else:
+        status = f"failed: {result['error']}" if result['error'] else f"{len(result['summary'])} sentences in {result['seconds']:.1f}s"
+        print(f"{result['name']}: {status}", flush=True)
+
+
+def main(argv=None):
+    """Run the CLI; returns 0 when every document was summarized, 1 when any failed and 2 on bad input."""
+    args = parse_args(argv)
+    try:
+        file_paths = input_files(args.inputs)
+        config = load_config(args.config)
+        glove_file = config.pop('glove_file', 'vectors.txt')
+        cache = None if args.no_cache else ResultCache(args.cache)
+        summarizer = Summarizer(args.glove or glove_file, cache=cache, **config)
+        summarizer.ensure_glove_vectors()
+    except (OSError, TypeError, ValueError) as e:
+        print(f"tos-summarize: {e}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    try:
+        families = {file_path: 'revisions' for file_path in file_paths} if args.family else None
+        results = batch_summarize(file_paths, summarizer, workers=args.workers, summary_folder=args.out,
+                                  write_artifacts=args.artifacts, families=families,
+                                  progress_callback=lambda done, total, result: report(result, args.json))
+    except Exception as e:
+        # The batch itself failed (e.g. a broken worker pool or no shared memory), not a single document
+        print(f"tos-summarize: batch failed: {type(e).__name__}: {e}", file=sys.stderr)
+        if args.json:
+            print(json.dumps({'documents': len(file_paths), 'error': f"{type(e).__name__}: {e}",
+                              'seconds': time.perf_counter() - start}), flush=True)
+        return 1
+
+    failed = [result for result in results if result['error']]
+    seconds = time.perf_counter() - start
+    if args.json:
+        print(json.dumps({'documents': len(results), 'succeeded': len(results) - len(failed), 'failed': len(failed),
+                          'seconds': seconds}), flush=True)
+    else:
+        print(f"Batch summarization completed: {len(results) - len(failed)} succeeded, {len(failed)} failed in {seconds:.1f}s.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # Usage: python tos_summarize.py input/*.txt --out Summary --workers 4 --config settings.json [--json]
+    sys.exit(main())